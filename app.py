@@ -1,12 +1,28 @@
 import streamlit as st
-import requests
 import os
 import plotly.express as px
 import urllib.parse
+import hashlib
 import pandas as pd
 import re
 from collections import defaultdict
 
+import snapshot
+from governance_data import (
+    API_HOST,
+    fetch_data,
+    process_bundles,
+    get_approval_tasks,
+    get_policy_details_map,
+    get_policy_stage_counts,
+    get_model_attachment_map,
+    get_model_versions,
+    get_summary_metrics,
+    PENDING_TASKS_WARNING_THRESHOLD,
+    load_bundle_evidence,
+    get_evidence_completeness,
+)
+
 # ----------------------------------------------------
 #   PAGE CONFIGURATION & CUSTOM CSS
 # ----------------------------------------------------
@@ -52,8 +68,9 @@ st.markdown(
 # ----------------------------------------------------
 #   ENV CONFIG & CONSTANTS
 # ----------------------------------------------------
-API_HOST = os.getenv("API_HOST", "https://domino.domino.tech")
-API_KEY = os.getenv("API_KEY", "")
+# When set, the dashboard renders from the latest snapshot written by
+# `python snapshot.py --out-dir <dir>` and never calls the Domino API.
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
 
 st.title("Governance Dashboard")
 
@@ -64,6 +81,7 @@ st.sidebar.title("Navigation")
 st.sidebar.markdown("[Summary](#summary)", unsafe_allow_html=True)
 st.sidebar.markdown("[Detailed Metrics](#detailed-metrics)", unsafe_allow_html=True)
 st.sidebar.markdown("[Policies Adoption](#policies-adoption)", unsafe_allow_html=True)
+st.sidebar.markdown("[Evidence Completeness](#evidence-completeness)", unsafe_allow_html=True)
 st.sidebar.markdown("[Governed Bundles Details](#governed-bundles-details-table)", unsafe_allow_html=True)
 st.sidebar.markdown("[Registered Models](#registered-models)", unsafe_allow_html=True)
 st.sidebar.markdown("[Bundles by Project](#bundles-by-project)", unsafe_allow_html=True)
@@ -71,6 +89,9 @@ st.sidebar.markdown("[Bundles by Project](#bundles-by-project)", unsafe_allow_ht
 # Optional debug checkbox
 show_debug = st.sidebar.checkbox("Show Bundle Debug Info", value=False)
 
+# One faceted figure for all policies instead of one chart (and payload) per policy
+faceted_adoption = st.sidebar.checkbox("Single Policies Adoption Chart", value=False)
+
 # ----------------------------------------------------
 #   REFRESH BUTTON TO CLEAR CACHE
 # ----------------------------------------------------
@@ -79,128 +100,8 @@ if st.button("Refresh Data"):
     st.rerun()
 
 # ----------------------------------------------------
-#   CONSOLIDATED API CALL HELPER
-# ----------------------------------------------------
-def api_call(method, endpoint, params=None, json=None):
-    headers = {"X-Domino-Api-Key": API_KEY}
-    url = f"{API_HOST}{endpoint}"
-    return requests.request(method, url, headers=headers, params=params, json=json)
-
-# ----------------------------------------------------
-#   HELPER FUNCTIONS (USING api_call)
+#   HELPER FUNCTIONS
 # ----------------------------------------------------
-@st.cache_data
-def fetch_bundles():
-    try:
-        resp = api_call("GET", "/api/governance/v1/bundles")
-        if resp.status_code != 200:
-            st.error(f"Error fetching bundles: {resp.status_code} - {resp.text}")
-            return []
-        return resp.json().get("data", [])
-    except Exception as e:
-        st.error(f"Error while fetching bundles: {e}")
-        return []
-
-@st.cache_data
-def fetch_all_projects():
-    try:
-        resp = api_call("GET", "/v4/projects")
-        if resp.status_code != 200:
-            st.error(f"Error fetching projects: {resp.status_code} - {resp.text}")
-            return []
-        return resp.json()
-    except Exception as e:
-        st.error(f"Error while fetching projects: {e}")
-        return []
-
-@st.cache_data
-def fetch_tasks_for_project(project_id):
-    try:
-        resp = api_call("GET", f"/api/projects/v1/projects/{project_id}/goals")
-        if resp.status_code == 403:
-            # Silently handle permission errors
-            return []
-        if resp.status_code != 200:
-            st.error(f"Error fetching tasks for project {project_id}: {resp.status_code}")
-            return []
-        data = resp.json()
-        if "goals" not in data:
-            st.error(f"Unexpected tasks structure for project {project_id}: {data}")
-            return []
-        return [g for g in data["goals"] if g.get("status") != "Completed"]
-    except Exception as e:
-        st.error(f"Error while fetching tasks for project {project_id}: {e}")
-        return []
-
-@st.cache_data
-def fetch_policy_details(policy_id):
-    try:
-        resp = api_call("GET", f"/api/governance/v1/policies/{policy_id}")
-        if resp.status_code != 200:
-            st.error(f"Error fetching policy details for {policy_id}: {resp.status_code}")
-            return None
-        return resp.json()
-    except Exception as e:
-        st.error(f"Error while fetching policy details for {policy_id}: {e}")
-        return None
-
-@st.cache_data
-def fetch_registered_models():
-    try:
-        resp = api_call("GET", "/api/registeredmodels/v1")
-        if resp.status_code != 200:
-            st.error(f"Error fetching registered models: {resp.status_code} - {resp.text}")
-            return []
-        return resp.json().get("items", [])
-    except Exception as e:
-        st.error(f"Error while fetching registered models: {e}")
-        return []
-
-@st.cache_data
-def fetch_bundle_evidence(bundle_id, policy_id):
-    try:
-        # Try to get the bundle evidence which includes project info
-        resp = api_call("GET", f"/api/governance/v1/bundles/{bundle_id}/evidence/{policy_id}")
-        st.write(f"Bundle evidence response for {bundle_id}: {resp.status_code}")
-        if resp.status_code == 200:
-            data = resp.json()
-            st.write(f"Bundle evidence data: {data}")
-            return data
-        return None
-    except Exception as e:
-        st.error(f"Error fetching bundle evidence for {bundle_id}: {e}")
-        return None
-
-@st.cache_data
-def fetch_project_details(project_id):
-    try:
-        # Try the governance API endpoint for project details
-        resp = api_call("GET", f"/api/governance/v1/projects/{project_id}")
-        st.write(f"Project {project_id} governance response: {resp.status_code}")
-        if resp.status_code == 200:
-            data = resp.json()
-            st.write(f"Project data: {data}")
-            return data
-        return None
-    except Exception as e:
-        st.error(f"Error fetching project details for {project_id}: {e}")
-        return None
-
-@st.cache_data
-def fetch_bundle_details(bundle_id):
-    try:
-        # Use the governance API bundle endpoint
-        resp = api_call("GET", f"/api/governance/v1/bundles/{bundle_id}")
-        st.write(f"Bundle {bundle_id} details response: {resp.status_code}")
-        if resp.status_code == 200:
-            data = resp.json()
-            st.write(f"Bundle details: {data}")
-            return data
-        return None
-    except Exception as e:
-        st.error(f"Error fetching bundle details for {bundle_id}: {e}")
-        return None
-
 def build_domino_link(owner: str, project_name: str, artifact: str = "overview",
                       model_name: str = "", version: str = "",
                       bundle_id: str = "", policy_id: str = "") -> str:
@@ -221,19 +122,6 @@ def build_domino_link(owner: str, project_name: str, artifact: str = "overview",
         return f"{base}/governance/policy/{policy_id}"
     return f"{base}/u/{enc_owner}/{enc_project}/overview"
 
-def parse_task_description(description):
-    try:
-        start = description.find("[")
-        end = description.find("]")
-        bundle_name = description[start + 1 : end]
-        link_start = description.find("(")
-        link_end = description.find(")")
-        bundle_link = description[link_start + 1 : link_end]
-        bundle_link = f"{API_HOST}{bundle_link}"
-        return bundle_name, bundle_link
-    except Exception:
-        return None, None
-
 def plot_policy_stages_interactive(policy_name, stages, bundle_data):
     """Interactive horizontal bar chart with Plotly."""
     import plotly.express as px
@@ -254,6 +142,42 @@ def plot_policy_stages_interactive(policy_name, stages, bundle_data):
     fig.update_layout(title_font_size=14, xaxis_title_font_size=12, yaxis_title_font_size=12)
     return fig
 
+def plot_policy_stages_faceted(stage_counts):
+    """All policies in one horizontal bar chart, one facet per policy."""
+    df = pd.DataFrame(stage_counts).rename(columns={
+        "policy": "Policy", "stage": "Stage", "bundles": "Number of Bundles"
+    })
+    num_policies = df["Policy"].nunique()
+    fig = px.bar(
+        df,
+        x="Number of Bundles",
+        y="Stage",
+        orientation="h",
+        facet_col="Policy",
+        facet_col_wrap=1,
+        facet_row_spacing=min(0.08, 0.5 / num_policies),
+        title="Policy Adoption",
+        labels={"Number of Bundles": "Count", "Stage": "Stage"},
+    )
+    # Each policy has its own stages; keep the shared count scale
+    fig.update_yaxes(matches=None, showticklabels=True)
+    fig.update_xaxes(showticklabels=True)
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    fig.update_layout(
+        height=80 + len(df) * 30 + num_policies * 50,
+        title_font_size=14,
+    )
+    return fig
+
+@st.cache_resource(max_entries=32)
+def policy_adoption_figure(data_version, filters, _stage_counts):
+    """Faceted adoption figure, cached per data version and filter selection.
+
+    The figure object itself is shared (st.plotly_chart only reads it), so a hit
+    skips building it; serializing it for the browser still happens every rerun.
+    """
+    return plot_policy_stages_faceted(_stage_counts)
+
 def derive_project_name(bundle_name: str) -> str:
     """Derive project name from bundle name based on common patterns."""
     if not bundle_name:
@@ -277,65 +201,40 @@ def derive_project_name(bundle_name: str) -> str:
     return "UNKNOWN"
 
 # ----------------------------------------------------
-#   DATA FETCHING AND PROCESSING
+#   DATA LOADING (SNAPSHOT OR LIVE API)
 # ----------------------------------------------------
-@st.cache_data
-def fetch_data():
-    """Fetch all required data and return as a tuple."""
-    bundles = fetch_bundles()
-    projects = fetch_all_projects()
-    models = fetch_registered_models()
-    return bundles, projects, models
-
-def process_bundles(bundles):
-    """Process bundles to add required information."""
-    processed_bundles = []
-    for b in bundles:
-        # Add owner info
-        created_by = b.get("createdBy", {})
-        b["projectOwner"] = created_by.get("userName", "unknown_user")
-        
-        # Add project name
-        project_name = b.get("projectName")
-        b["projectName"] = project_name if project_name else "UNKNOWN"
-        
-        processed_bundles.append(b)
-    return processed_bundles
-
-def get_approval_tasks(bundles):
-    """Get approval tasks for the given bundles."""
-    approval_tasks = []
-    for b in bundles:
-        project_id = b.get("projectId")
-        if not project_id:
-            continue
-        tasks = fetch_tasks_for_project(project_id)
-        for t in tasks:
-            desc = t.get("description", "")
-            if "Approval requested Stage" in desc:
-                b_name, b_link = parse_task_description(desc)
-                if b_name and b_link and b_name == b.get("name"):
-                    approval_tasks.append({
-                        "task_name": t.get("title", "Unnamed Task"),
-                        "stage": desc.split("Stage")[1].split(":")[0].strip(),
-                        "bundle_name": b_name,
-                        "bundle_link": b_link,
-                    })
-    return approval_tasks
-
-def get_model_attachment_map(bundles):
-    """Create map of model attachments from bundles."""
-    model_map = {}
-    for b in bundles:
-        owner = b.get("projectOwner", "unknown_user")
-        proj = b.get("projectName", "UNKNOWN")
-        for att in b.get("attachments", []):
-            if att.get("type") == "ModelVersion":
-                m_name = att.get("identifier", {}).get("name")
-                m_ver = att.get("identifier", {}).get("version")
-                if m_name and m_ver:
-                    model_map[(m_name, m_ver)] = (owner, proj)
-    return model_map
+@st.cache_resource(max_entries=1)
+def open_snapshot_tables(path):
+    """Memory-mapped snapshot tables, shared by all sessions; only the newest snapshot is kept."""
+    return snapshot.open_snapshot(path)
+
+def current_snapshot_path():
+    """Newest snapshot when SNAPSHOT_DIR is set, else None (live API mode)."""
+    if not SNAPSHOT_DIR:
+        return None
+    path = snapshot.latest_snapshot_path(SNAPSHOT_DIR)
+    if not path:
+        st.info(f"No snapshot found in {SNAPSHOT_DIR}. Run `python snapshot.py --out-dir {SNAPSHOT_DIR}`.")
+        st.stop()
+    return path
+
+def load_dashboard_data(snapshot_path):
+    """Return bundles, projects, models, approval tasks, policy details, the model attachment map
+    and the partial-data markers for requests that failed."""
+    if snapshot_path:
+        try:
+            return snapshot.read_snapshot(open_snapshot_tables(snapshot_path))
+        except (snapshot.SnapshotError, OSError) as e:
+            st.error(f"Could not read snapshot {snapshot_path}: {e}")
+            st.stop()
+
+    bundles, all_projects, models, base_failures = fetch_data()
+    bundles = process_bundles(bundles)
+    approval_tasks, task_failures = get_approval_tasks(bundles)
+    policy_details, policy_failures = get_policy_details_map(bundles)
+    model_attachment_map = get_model_attachment_map(bundles)
+    return (bundles, all_projects, models, approval_tasks, policy_details,
+            model_attachment_map, base_failures + task_failures + policy_failures)
 
 def get_filtered_bundles(bundles, selected_policy, selected_project, selected_status):
     """Filter bundles based on selection criteria."""
@@ -357,15 +256,10 @@ def get_filtered_bundles(bundles, selected_policy, selected_project, selected_st
 #   MAIN APPLICATION LOGIC
 # ----------------------------------------------------
 def main():
-    # Fetch all data
-    bundles, all_projects, models = fetch_data()
-    
-    # Process bundles
-    bundles = process_bundles(bundles)
-    
-    # Get additional data
-    approval_tasks = get_approval_tasks(bundles)
-    model_attachment_map = get_model_attachment_map(bundles)
+    # Load all data (from the latest snapshot when SNAPSHOT_DIR is set)
+    snapshot_path = current_snapshot_path()
+    (bundles, all_projects, models, approval_tasks,
+     policy_details, model_attachment_map, fetch_failures) = load_dashboard_data(snapshot_path)
     
     # Setup filters
     all_policy_options = sorted({b.get("policyName") for b in bundles if b.get("policyName")})
@@ -406,63 +300,22 @@ def main():
         if pid:
             project_map[pid] = proj
 
-    # Annotate bundles with project data
-    for b in bundles:
-        created_by = b.get("createdBy", {})
-        owner = created_by.get("userName", "unknown_user")
-        b["projectOwner"] = owner
-        
-        # Get project name directly from bundle data
-        project_name = b.get("projectName")
-        if project_name:
-            b["projectName"] = project_name
-        else:
-            st.error(f"No project name found in bundle {b.get('name', 'unnamed')}")
-            b["projectName"] = "UNKNOWN"
-
     # ----------------------------------------------------
     #   SUMMARY METRICS
     # ----------------------------------------------------
-    filtered_policy_names = {b.get("policyName") for b in filtered_bundles if b.get("policyName")}
-    num_policies = len(filtered_policy_names)
-    num_bundles = len(filtered_bundles)
-    num_pending_tasks = len(approval_tasks)
-
-    # Count how many models appear in filtered bundles
-    filtered_model_versions = set()
-    for b in filtered_bundles:
-        for att in b.get("attachments", []):
-            if att.get("type") == "ModelVersion":
-                identifier = att.get("identifier", {})
-                m_name = identifier.get("name")
-                m_ver = identifier.get("version")
-                if m_name and m_ver:
-                    filtered_model_versions.add((m_name, m_ver))
-    num_models_in_bundles = len(filtered_model_versions)
-
-    # Which projects appear in the filtered set
-    filtered_project_names = {b.get("projectName") for b in filtered_bundles}
-    num_projects_with_bundles = len(filtered_project_names)
-
-    # For "total projects", we interpret as how many are currently in the selected project filter
-    if selected_project == "All":
-        # That means "All" is selected, so let's show how many unique projects are in the entire system
-        # or we can show how many are in the entire system. We'll do entire system:
-        all_proj_names = {b.get("projectName") for b in bundles}
-        num_total_projects = len(all_proj_names)
-    else:
-        num_total_projects = 1
-
-    # Filtered model names from the attachments
+    summary = get_summary_metrics(bundles, filtered_bundles, models, approval_tasks, selected_project)
+    num_policies = summary["total_policies"]
+    num_bundles = summary["total_bundles"]
+    num_pending_tasks = summary["pending_tasks"]
+    num_registered_models = summary["registered_models"]
+    num_models_in_bundles = summary["models_in_bundles"]
+    num_total_projects = summary["total_projects"]
+    num_projects_with_bundles = summary["projects_with_bundles"]
+
+    # Filtered (model, version) pairs and model names from the attachments
+    filtered_model_versions = get_model_versions(filtered_bundles)
     filtered_model_names = set(mn for (mn, mv) in filtered_model_versions)
 
-    # For completeness, if the user wants to also see if the model's own project property matches
-    # the selected project. We'll skip that to keep it simpler.
-    num_registered_models = 0
-    for m in models:
-        if m.get("name", "") in filtered_model_names:
-            num_registered_models += 1
-
     # ----------------------------------------------------
     #   SUMMARY SECTION
     # ----------------------------------------------------
@@ -480,6 +333,9 @@ def main():
 
     col3.metric("Pending Tasks", num_pending_tasks)
     col3.markdown("[See list](#detailed-metrics)", unsafe_allow_html=True)
+    task_failures = [f for f in fetch_failures if f["source"] == "Project tasks"]
+    if task_failures:
+        col3.caption(f"Partial: tasks unavailable for {len(task_failures)} project(s)")
 
     col4.metric("Registered Models", num_registered_models)
     col4.markdown("[See list](#detailed-metrics)", unsafe_allow_html=True)
@@ -493,8 +349,15 @@ def main():
     col7.metric("Projects w/ Bundle", num_projects_with_bundles)
     col7.markdown("[See list](#detailed-metrics)", unsafe_allow_html=True)
 
-    if num_pending_tasks > 10:
-        st.warning("There are more than 10 pending tasks. Please review!")
+    if num_pending_tasks > PENDING_TASKS_WARNING_THRESHOLD:
+        st.warning(f"There are more than {PENDING_TASKS_WARNING_THRESHOLD} pending tasks. Please review!")
+
+    if fetch_failures:
+        st.warning(f"Partial data: {len(fetch_failures)} request(s) to the Domino API failed. "
+                   "Counts below may be incomplete.")
+        with st.expander("Partial Data Details"):
+            for f in fetch_failures:
+                st.write(f"- {f['source']} `{f['key']}`: {f['message']}")
 
     # ----------------------------------------------------
     #   DETAILED METRICS
@@ -617,13 +480,51 @@ def main():
 
     if not policies_dict:
         st.info("No policies found.")
+    elif faceted_adoption:
+        shown_policies = {pid: pname for pid, pname in policies_dict.items()
+                          if selected_policy == "All" or pname == selected_policy}
+        stage_counts = get_policy_stage_counts(filtered_bundles, policy_details, shown_policies)
+        for pid, pname in shown_policies.items():
+            if pid not in policy_details:
+                st.error(f"Could not fetch policy details for {pname}")
+        if stage_counts:
+            if snapshot_path:
+                data_version = snapshot.snapshot_version(snapshot_path)
+            else:
+                data_version = hashlib.sha1(repr(stage_counts).encode()).hexdigest()
+            filters = (selected_policy, selected_project, selected_status)
+            fig = policy_adoption_figure(data_version, filters, stage_counts)
+            st.plotly_chart(fig, use_container_width=True)
+
+            with st.expander("View Bundles by Policy and Stage"):
+                bundle_stage_rows = []
+                for fb in filtered_bundles:
+                    if fb.get("policyId") not in shown_policies:
+                        continue
+                    link = build_domino_link(owner=fb.get("projectOwner", "unknown_user"),
+                                             project_name=fb.get("projectName", "UNKNOWN"),
+                                             artifact="bundleEvidence",
+                                             bundle_id=fb.get("id", ""),
+                                             policy_id=fb.get("policyId", ""))
+                    bundle_stage_rows.append({
+                        "Policy": fb.get("policyName", "Unknown"),
+                        "Stage": fb.get("stage", "Unknown Stage"),
+                        "Bundle": f'<a href="{link}" target="_blank">{fb.get("name", "Unnamed Bundle")}</a>',
+                    })
+                if bundle_stage_rows:
+                    df_stage_bundles = pd.DataFrame(bundle_stage_rows).sort_values(["Policy", "Stage"])
+                    st.markdown(df_stage_bundles.to_html(escape=False, index=False), unsafe_allow_html=True)
+                else:
+                    st.write("No bundles match the current filters.")
+        else:
+            st.warning("No stages found for the selected policies.")
     else:
         for policy_id, policy_name in policies_dict.items():
             # If user selected a single policy and it's not this one, skip
             if selected_policy != "All" and policy_name != selected_policy:
                 continue
             st.subheader(f"Policy: {policy_name}")
-            details = fetch_policy_details(policy_id)
+            details = policy_details.get(policy_id)
             if details:
                 stages = details.get("stages", [])
                 if stages:
@@ -654,6 +555,35 @@ def main():
             else:
                 st.error(f"Could not fetch policy details for {policy_name}")
 
+    # ----------------------------------------------------
+    #   EVIDENCE COMPLETENESS (loaded on demand)
+    # ----------------------------------------------------
+    st.markdown("---")
+    st.header("Evidence Completeness")
+    st.markdown('<a id="evidence-completeness"></a>', unsafe_allow_html=True)
+
+    governed_in_view = [b for b in filtered_bundles if b.get("policyName")]
+    if not st.checkbox(f"Load evidence for the {len(governed_in_view)} governed bundles in view", value=False):
+        st.caption("Evidence is fetched only when requested, for the bundles matching the current filters.")
+    else:
+        if snapshot_path:
+            evidence_map = snapshot.read_snapshot_evidence(open_snapshot_tables(snapshot_path))
+            evidence_failures = [f for f in fetch_failures if f["source"] == "Bundle evidence"]
+            if evidence_map is None:
+                st.info("This snapshot has no evidence. Build it with `python snapshot.py --with-evidence`.")
+                evidence_map = {}
+        else:
+            with st.spinner("Loading bundle evidence..."):
+                evidence_map, evidence_failures = load_bundle_evidence(governed_in_view)
+        if evidence_failures:
+            st.warning(f"Partial data: evidence unavailable for {len(evidence_failures)} bundle(s).")
+
+        completeness_rows = get_evidence_completeness(governed_in_view, policy_details, evidence_map)
+        if completeness_rows:
+            st.dataframe(pd.DataFrame(completeness_rows), use_container_width=True, hide_index=True)
+        else:
+            st.write("No evidence found for the bundles in view.")
+
     # ----------------------------------------------------
     #   GOVERNED BUNDLES DETAILS (Table)
     # ----------------------------------------------------
@@ -661,10 +591,15 @@ def main():
     st.header("Governed Bundles Details (Table)")
     st.markdown('<a id="governed-bundles-details-table"></a>', unsafe_allow_html=True)
 
+    # Tasks are matched to bundles by ID, so same-named bundles in other projects don't collide
+    tasks_by_bundle = defaultdict(list)
+    for t in approval_tasks:
+        tasks_by_bundle[t.get("bundle_id")].append(t)
+
     governed_bundles = [b for b in filtered_bundles if b.get("policyName")]
     governed_bundles = sorted(
         governed_bundles,
-        key=lambda b: any(t["bundle_name"] == b.get("name", "") for t in approval_tasks),
+        key=lambda b: b.get("id") in tasks_by_bundle,
         reverse=True
     )
 
@@ -676,7 +611,7 @@ def main():
 
     gov_table_rows = []
     for b in governed_bundles:
-        owner = b.get("createdBy", {}).get("userName", "unknown_user")
+        owner = b.get("projectOwner", "unknown_user")
         proj = b.get("projectName", "UNKNOWN")
         b_name = b.get("name", "Unnamed")
         b_id = b.get("id", "")
@@ -696,7 +631,7 @@ def main():
         b_html = f'<a href="{evidence_url}" target="_blank">{b_name}</a>'
         pol_html = f'<a href="{policy_url}" target="_blank">{pol_name}</a>'
 
-        rel_tasks = [t for t in approval_tasks if t["bundle_name"] == b_name]
+        rel_tasks = tasks_by_bundle.get(b_id, [])
         if rel_tasks:
             tasks_list = []
             for t in rel_tasks:
@@ -760,7 +695,7 @@ def main():
 
     bundle_rows = []
     for b in filtered_bundles:
-        owner = b.get("createdBy", {}).get("userName", "unknown_user")
+        owner = b.get("projectOwner", "unknown_user")
         proj = b.get("projectName", "UNKNOWN")
         b_name = b.get("name", "Unnamed Bundle")
         state = b.get("state", "Unknown")
@@ -12,4 +12,9 @@ echo "enableXsrfProtection = false" >> ~/.streamlit/config.toml
  
 export PATH=$HOME/.local/bin:$PATH
 echo "Updated PATH: $PATH"  # For debugging
+# Serve the JSON metrics endpoint alongside the app when reading from snapshots
+if [ -n "$SNAPSHOT_DIR" ]; then
+  python metrics_server.py --port "${METRICS_PORT:-8889}" &
+fi
+
 streamlit run app.py --server.port 8888
\ No newline at end of file
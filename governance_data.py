@@ -0,0 +1,447 @@
+"""Domino API access and data processing shared by the dashboard and the snapshot builder."""
+import streamlit as st
+import requests
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from limiter import AdaptiveLimiter, THROTTLE_STATUSES
+
+# ----------------------------------------------------
+#   ENV CONFIG & CONSTANTS
+# ----------------------------------------------------
+API_HOST = os.getenv("API_HOST", "https://domino.domino.tech")
+API_KEY = os.getenv("API_KEY", "")
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "16"))
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+API_MAX_ATTEMPTS = 3
+API_RETRY_BACKOFF = 0.5
+PENDING_TASKS_WARNING_THRESHOLD = 10
+EVIDENCE_CACHE_TTL = int(os.getenv("EVIDENCE_CACHE_TTL", "300"))
+FAILURE_CACHE_TTL = int(os.getenv("FAILURE_CACHE_TTL", "60"))
+
+# One limiter per process, shared by every request (and every fan-out) to the Domino API
+API_LIMITER = AdaptiveLimiter(max_limit=API_MAX_CONCURRENCY)
+
+ID_SEGMENT_RE = re.compile(r"/[0-9a-fA-F-]{8,}(?=/|$)")
+
+class FetchError(Exception):
+    """A Domino API call failed after retries. Raised rather than cached as an empty result."""
+
+# st.cache_data does not cache exceptions, so without this every rerun would retry
+# (and wait on) an endpoint that just failed: {(source, key): (expires_at, message)}
+_failure_lock = threading.Lock()
+_recent_failures = {}
+
+def recent_failure(source, key):
+    """Message of a failure of (source, key) within the last FAILURE_CACHE_TTL seconds, or None."""
+    with _failure_lock:
+        entry = _recent_failures.get((source, key))
+        if entry and entry[0] <= time.monotonic():
+            del _recent_failures[(source, key)]
+            entry = None
+    return entry[1] if entry else None
+
+def remember_failure(source, key, message):
+    with _failure_lock:
+        _recent_failures[(source, key)] = (time.monotonic() + FAILURE_CACHE_TTL, message)
+
+# ----------------------------------------------------
+#   CONSOLIDATED API CALL HELPER
+# ----------------------------------------------------
+def api_call(method, endpoint, params=None, json=None):
+    headers = {"X-Domino-Api-Key": API_KEY}
+    url = f"{API_HOST}{endpoint}"
+    # Endpoints differ a lot in latency, so the limiter keeps a baseline per path without IDs
+    latency_key = f"{method} {ID_SEGMENT_RE.sub('/{id}', endpoint)}"
+    for attempt in range(1, API_MAX_ATTEMPTS + 1):
+        with API_LIMITER.slot(latency_key) as record:
+            resp = requests.request(method, url, headers=headers, params=params, json=json,
+                                    timeout=API_TIMEOUT)
+            record(resp)
+        if resp.status_code not in THROTTLE_STATUSES or attempt == API_MAX_ATTEMPTS:
+            return resp
+        # With a Retry-After header the limiter already pauses the next acquire
+        if not resp.headers.get("Retry-After"):
+            time.sleep(API_RETRY_BACKOFF * 2 ** (attempt - 1))
+    return resp
+
+def fetch_concurrently(source, fetch, keys):
+    """Call fetch(key) for every key in parallel, gated by API_LIMITER.
+
+    Returns ({key: result}, {key: error message}) so callers can report
+    failed keys as partial data instead of treating them as empty. Keys of
+    source that failed recently are not fetched again (see recent_failure).
+    """
+    results, errors = {}, {}
+    for key in keys:
+        message = recent_failure(source, key)
+        if message is not None:
+            errors[key] = message
+    keys = [key for key in keys if key not in errors]
+    if not keys:
+        return results, errors
+
+    # Workers need the script run context for st.cache_data; it is None outside Streamlit
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def run(key):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch(key)
+
+    with ThreadPoolExecutor(max_workers=min(API_MAX_CONCURRENCY, len(keys))) as pool:
+        futures = {pool.submit(run, key): key for key in keys}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+                remember_failure(source, key, errors[key])
+    return results, errors
+
+def fetch_failure(source, key, message):
+    """Partial-data marker shown in the UI for a request that could not be completed."""
+    return {"source": source, "key": str(key), "message": message}
+
+# ----------------------------------------------------
+#   HELPER FUNCTIONS (USING api_call)
+# ----------------------------------------------------
+# Fetchers raise FetchError instead of returning an empty result, so a throttled
+# or failed call is not cached and is never mistaken for "no data".
+def fetch_json(endpoint):
+    """GET an endpoint and return its JSON, raising FetchError on any failure."""
+    try:
+        resp = api_call("GET", endpoint)
+    except requests.RequestException as e:
+        raise FetchError(f"request failed: {e}") from e
+    if resp.status_code != 200:
+        raise FetchError(f"HTTP {resp.status_code}")
+    try:
+        return resp.json()
+    except ValueError as e:
+        raise FetchError(f"invalid JSON response: {e}") from e
+
+@st.cache_data
+def fetch_bundles():
+    return fetch_json("/api/governance/v1/bundles").get("data", [])
+
+@st.cache_data
+def fetch_all_projects():
+    return fetch_json("/v4/projects")
+
+@st.cache_data
+def fetch_tasks_for_project(project_id):
+    """Open goals for a project, or None if the API key has no access to it."""
+    try:
+        resp = api_call("GET", f"/api/projects/v1/projects/{project_id}/goals")
+    except requests.RequestException as e:
+        raise FetchError(f"request failed: {e}") from e
+    if resp.status_code == 403:
+        return None
+    if resp.status_code != 200:
+        raise FetchError(f"HTTP {resp.status_code}")
+    data = resp.json()
+    if "goals" not in data:
+        raise FetchError("unexpected response structure (no 'goals')")
+    return [g for g in data["goals"] if g.get("status") != "Completed"]
+
+@st.cache_data
+def fetch_policy_details(policy_id):
+    return fetch_json(f"/api/governance/v1/policies/{policy_id}")
+
+@st.cache_data
+def fetch_registered_models():
+    return fetch_json("/api/registeredmodels/v1").get("items", [])
+
+@st.cache_data(ttl=EVIDENCE_CACHE_TTL)
+def fetch_bundle_evidence(bundle_id, policy_id, bundle_version=""):
+    """Evidence results of a bundle under a policy.
+
+    Bundle records carry no modification time, so evidence submitted within a
+    stage cannot be detected from the bundle list. Results therefore expire
+    after EVIDENCE_CACHE_TTL seconds. bundle_version (stage and state) only
+    takes part in the cache key, so a bundle moving stage refetches at once.
+    """
+    return fetch_json(f"/api/governance/v1/bundles/{bundle_id}/evidence/{policy_id}")
+
+# ----------------------------------------------------
+#   TASK INGESTION
+# ----------------------------------------------------
+# Goal descriptions look like
+#   "Approval requested Stage <stage>: [<bundle name>](/u/<owner>/<project>/governance/bundle/<id>/...)"
+APPROVAL_STAGE_RE = re.compile(r"Approval requested Stage(?P<stage>[^:]*):")
+BUNDLE_LINK_RE = re.compile(r"\[(?P<name>[^\]]*)\]\((?P<link>[^)]*)\)")
+BUNDLE_ID_RE = re.compile(r"/bundle/(?P<id>[^/?#]+)")
+
+def parse_approval_task(goal):
+    """Structured record for an approval-request goal, or None for any other goal."""
+    desc = goal.get("description") or ""
+    stage_match = APPROVAL_STAGE_RE.search(desc)
+    link_match = BUNDLE_LINK_RE.search(desc)
+    if not stage_match or not link_match or not link_match.group("name"):
+        return None
+    link = link_match.group("link")
+    id_match = BUNDLE_ID_RE.search(link)
+    return {
+        "task_name": goal.get("title", "Unnamed Task"),
+        "stage": stage_match.group("stage").strip(),
+        "bundle_id": id_match.group("id") if id_match else None,
+        "bundle_name": link_match.group("name"),
+        "bundle_link": f"{API_HOST}{link}",
+    }
+
+def index_approval_tasks(goals_by_project):
+    """Parse every project's goals once and index the approval tasks.
+
+    Returns two maps: {(project_id, bundle_id): [task]} for tasks whose link
+    carries a bundle ID, and {(project_id, bundle_name): [task]} for the rest
+    (see get_approval_tasks for how same-named bundles are handled).
+    """
+    by_id = defaultdict(list)
+    by_name = defaultdict(list)
+    for project_id, goals in goals_by_project.items():
+        for goal in goals or []:
+            task = parse_approval_task(goal)
+            if not task:
+                continue
+            task["project_id"] = project_id
+            if task["bundle_id"]:
+                by_id[(project_id, task["bundle_id"])].append(task)
+            else:
+                by_name[(project_id, task["bundle_name"])].append(task)
+    return by_id, by_name
+
+# ----------------------------------------------------
+#   DATA FETCHING AND PROCESSING
+# ----------------------------------------------------
+def fetch_data():
+    """Fetch bundles, projects and registered models, plus partial-data markers.
+
+    A source that fails is returned as [] with a marker. The fetchers themselves
+    are cached; a failure is remembered for FAILURE_CACHE_TTL and retried after that.
+    """
+    sources = [
+        ("Bundles", fetch_bundles),
+        ("Projects", fetch_all_projects),
+        ("Registered models", fetch_registered_models),
+    ]
+    results, failures = [], []
+    for source, fetch in sources:
+        message = recent_failure(source, "all")
+        if message is None:
+            try:
+                results.append(fetch())
+                continue
+            except FetchError as e:
+                message = str(e)
+                remember_failure(source, "all", message)
+        results.append([])
+        failures.append(fetch_failure(source, "all", message))
+    bundles, projects, models = results
+    return bundles, projects, models, failures
+
+def process_bundles(bundles):
+    """Process bundles to add required information."""
+    processed_bundles = []
+    for b in bundles:
+        # Add owner info
+        created_by = b.get("createdBy", {})
+        b["projectOwner"] = created_by.get("userName", "unknown_user")
+        
+        # Add project name
+        project_name = b.get("projectName")
+        b["projectName"] = project_name if project_name else "UNKNOWN"
+        
+        processed_bundles.append(b)
+    return processed_bundles
+
+def get_approval_tasks(bundles):
+    """Get approval tasks for the given bundles, plus partial-data markers for failed projects."""
+    project_ids = sorted({b.get("projectId") for b in bundles if b.get("projectId")})
+    tasks_by_project, errors = fetch_concurrently("Project tasks", fetch_tasks_for_project,
+                                                  project_ids)
+    # Projects the API key cannot read (403, tasks None) are skipped as before, not
+    # reported: they are a permission setting, not missing data.
+    failures = [fetch_failure("Project tasks", pid, msg) for pid, msg in sorted(errors.items())]
+
+    tasks_by_id, tasks_by_name = index_approval_tasks(tasks_by_project)
+    # A task without a bundle ID is matched by name only when exactly one bundle in
+    # the project has that name; ambiguous tasks are skipped rather than guessed.
+    name_counts = Counter((b.get("projectId"), b.get("name")) for b in bundles)
+    approval_tasks = []
+    for b in bundles:
+        project_id = b.get("projectId")
+        if not project_id:
+            continue
+        matched = list(tasks_by_id.get((project_id, b.get("id")), []))
+        if name_counts[(project_id, b.get("name"))] == 1:
+            matched += tasks_by_name.get((project_id, b.get("name")), [])
+        for task in matched:
+            approval_tasks.append({**task, "bundle_id": b.get("id")})
+    return approval_tasks, failures
+
+def get_policy_details_map(bundles):
+    """Fetch policy details (including stages) for every policy referenced by a bundle."""
+    policy_ids = sorted({b.get("policyId") for b in bundles if b.get("policyId")})
+    results, errors = fetch_concurrently("Policy details", fetch_policy_details, policy_ids)
+    policy_details = {pid: details for pid, details in results.items() if details}
+    failures = [fetch_failure("Policy details", pid, msg) for pid, msg in sorted(errors.items())]
+    return policy_details, failures
+
+def get_policy_stage_counts(bundles, policy_details, policies):
+    """Bundle counts per stage, in policy stage order, for each policy in {policy_id: policy_name}.
+
+    Stages without bundles are included with a count of 0. Policies without
+    details are skipped.
+    """
+    counts = defaultdict(int)
+    for b in bundles:
+        counts[(b.get("policyId"), b.get("stage", "Unknown Stage"))] += 1
+
+    rows = []
+    for pid, pname in policies.items():
+        details = policy_details.get(pid)
+        if not details:
+            continue
+        for stage in details.get("stages", []):
+            rows.append({
+                "policy_id": pid,
+                "policy": pname,
+                "stage": stage["name"],
+                "bundles": counts[(pid, stage["name"])],
+            })
+    return rows
+
+def get_model_versions(bundles):
+    """Distinct (model name, version) pairs attached to the given bundles."""
+    model_versions = set()
+    for b in bundles:
+        for att in b.get("attachments", []):
+            if att.get("type") == "ModelVersion":
+                identifier = att.get("identifier", {})
+                m_name = identifier.get("name")
+                m_ver = identifier.get("version")
+                if m_name and m_ver:
+                    model_versions.add((m_name, m_ver))
+    return model_versions
+
+def get_summary_metrics(bundles, filtered_bundles, models, approval_tasks, selected_project="All"):
+    """Summary counts shown at the top of the dashboard (and served by metrics_server.py)."""
+    filtered_policy_names = {b.get("policyName") for b in filtered_bundles if b.get("policyName")}
+    filtered_model_versions = get_model_versions(filtered_bundles)
+    filtered_model_names = {mn for (mn, mv) in filtered_model_versions}
+
+    # For "total projects", we interpret as how many are currently in the selected project filter.
+    # With "All" selected, that is every unique project in the entire system.
+    if selected_project == "All":
+        num_total_projects = len({b.get("projectName") for b in bundles})
+    else:
+        num_total_projects = 1
+
+    return {
+        "total_policies": len(filtered_policy_names),
+        "total_bundles": len(filtered_bundles),
+        "pending_tasks": len(approval_tasks),
+        "registered_models": sum(1 for m in models if m.get("name", "") in filtered_model_names),
+        "models_in_bundles": len(filtered_model_versions),
+        "total_projects": num_total_projects,
+        "projects_with_bundles": len({b.get("projectName") for b in filtered_bundles}),
+    }
+
+def get_model_attachment_map(bundles):
+    """Create map of model attachments from bundles."""
+    model_map = {}
+    for b in bundles:
+        owner = b.get("projectOwner", "unknown_user")
+        proj = b.get("projectName", "UNKNOWN")
+        for att in b.get("attachments", []):
+            if att.get("type") == "ModelVersion":
+                m_name = att.get("identifier", {}).get("name")
+                m_ver = att.get("identifier", {}).get("version")
+                if m_name and m_ver:
+                    model_map[(m_name, m_ver)] = (owner, proj)
+    return model_map
+
+def bundle_version(bundle):
+    """Stage and state of a bundle, used to key its cached evidence (see fetch_bundle_evidence)."""
+    return "|".join(str(bundle.get(k, "")) for k in ("stage", "state"))
+
+def load_bundle_evidence(bundles):
+    """Fetch evidence for every (bundle, policy) pair concurrently.
+
+    Returns ({(bundle_id, policy_id): evidence}, partial-data markers).
+    """
+    versions = {
+        (b["id"], b["policyId"]): bundle_version(b)
+        for b in bundles if b.get("id") and b.get("policyId")
+    }
+
+    def fetch(key):
+        bundle_id, policy_id = key
+        return fetch_bundle_evidence(bundle_id, policy_id, versions[key])
+
+    evidence_map, errors = fetch_concurrently("Bundle evidence", fetch, sorted(versions))
+    failures = [fetch_failure("Bundle evidence", f"{bid}/{pid}", msg)
+                for (bid, pid), msg in sorted(errors.items())]
+    return evidence_map, failures
+
+def submitted_evidence_ids(evidence):
+    """IDs of the evidence items that have a result in a bundle evidence response."""
+    if isinstance(evidence, dict):
+        evidence = evidence.get("data", evidence.get("results", []))
+    ids = set()
+    for item in evidence or []:
+        if isinstance(item, dict):
+            eid = item.get("evidenceId") or item.get("id")
+            if eid:
+                ids.add(eid)
+    return ids
+
+def get_evidence_completeness(bundles, policy_details, evidence_map):
+    """Aggregate submitted vs. required evidence per (policy, stage) over the given bundles.
+
+    A bundle counts toward the stages it has reached, i.e. up to and including its
+    current stage in policy stage order. Bundles whose stage is not in the policy
+    are skipped, since it is unknown which stages they have reached.
+    """
+    totals = {}
+    for b in bundles:
+        key = (b.get("id"), b.get("policyId"))
+        policy = policy_details.get(b.get("policyId"))
+        if key not in evidence_map or not policy:
+            continue
+        stages = policy.get("stages", [])
+        stage_names = [stage.get("name") for stage in stages]
+        if b.get("stage") not in stage_names:
+            continue
+        reached = stages[:stage_names.index(b.get("stage")) + 1]
+        submitted = submitted_evidence_ids(evidence_map[key])
+        for stage in reached:
+            required = {e.get("id") for e in stage.get("evidenceSet", []) if e.get("id")}
+            row = totals.setdefault((b.get("policyName", "Unknown"), stage.get("name", "Unknown Stage")), {
+                "bundles": 0, "required": 0, "submitted": 0, "complete": 0,
+            })
+            done = len(required & submitted)
+            row["bundles"] += 1
+            row["required"] += len(required)
+            row["submitted"] += done
+            row["complete"] += int(done == len(required))
+
+    rows = []
+    for (policy_name, stage_name), t in totals.items():
+        pct = 100.0 * t["submitted"] / t["required"] if t["required"] else 100.0
+        rows.append({
+            "Policy": policy_name,
+            "Stage": stage_name,
+            "Bundles": t["bundles"],
+            "Evidence Submitted": f"{t['submitted']} / {t['required']}",
+            "Completeness": f"{pct:.0f}%",
+            "Bundles Complete": t["complete"],
+        })
+    return rows
@@ -0,0 +1,113 @@
+"""Adaptive concurrency limiter shared by all Domino API calls.
+
+The number of requests allowed in flight follows an AIMD policy: it grows by
+roughly one per round trip while responses are close to their endpoint's
+uncongested latency, shrinks by 20% when latency climbs well above it, and
+is halved when the API throttles (429), fails (5xx) or the request errors out.
+A Retry-After header pauses every caller until the given time has passed.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+def parse_retry_after(value, max_delay=60.0):
+    """Return the Retry-After delay in seconds (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        delay = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0.0), max_delay)
+
+class AdaptiveLimiter:
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=16, latency_tolerance=2.0,
+                 baseline_drift=0.05):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.baseline_drift = baseline_drift
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        # Uncongested latency per endpoint class, see _update_baseline
+        self.baselines = {}
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot is free and no Retry-After pause is active."""
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def _update_baseline(self, key, latency):
+        """Approximate a windowed minimum: the baseline follows faster samples at once and
+        drifts up by baseline_drift per slower sample, so one fast outlier does not pin it."""
+        baseline = self.baselines.get(key)
+        baseline = latency if baseline is None else min(latency, baseline * (1 + self.baseline_drift))
+        self.baselines[key] = baseline
+        return baseline
+
+    def _decrease(self, now, latency, factor):
+        # At most once per round trip, so a burst of bad responses from the same
+        # congested window does not collapse the limit to the floor.
+        if now - self.last_decrease > latency:
+            self.limit = max(self.min_limit, self.limit * factor)
+            self.last_decrease = now
+
+    def release(self, status_code, latency, retry_after=None, key=None):
+        """Free a slot and adjust the limit from the outcome of the request.
+
+        status_code is None when the request raised (e.g. timed out) before a
+        response arrived. key groups requests with comparable latency, e.g. the
+        endpoint path without IDs.
+        """
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            delay = parse_retry_after(retry_after)
+            if delay:
+                self.paused_until = max(self.paused_until, now + delay)
+
+            if status_code is None or status_code in THROTTLE_STATUSES:
+                self._decrease(now, latency, 0.5)
+            else:
+                baseline = self._update_baseline(key, latency)
+                if latency <= baseline * self.latency_tolerance:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                elif latency > baseline * self.latency_tolerance * 2:
+                    # Queueing at the API: back off gently before it starts throttling
+                    self._decrease(now, latency, 0.8)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, key=None):
+        """Hold a slot for one request; call the yielded function with the response."""
+        self.acquire()
+        start = time.monotonic()
+        outcome = {"status_code": None, "retry_after": None}
+
+        def record(resp):
+            outcome["status_code"] = resp.status_code
+            outcome["retry_after"] = resp.headers.get("Retry-After")
+
+        try:
+            yield record
+        finally:
+            self.release(outcome["status_code"], time.monotonic() - start,
+                         outcome["retry_after"], key)
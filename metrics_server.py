@@ -0,0 +1,129 @@
+"""Lightweight JSON metrics endpoint, run alongside the dashboard.
+
+Serves the dashboard's summary metrics and per-policy stage counts, computed
+from the latest snapshot in SNAPSHOT_DIR, so other dashboards and alerting
+scripts do not need to render the Streamlit page:
+
+    SNAPSHOT_DIR=/mnt/snapshots python metrics_server.py --port 8889
+    curl -H 'If-None-Match: "<etag>"' http://localhost:8889/metrics
+
+The body is computed once per snapshot. Responses carry a strong ETag over the
+metrics alone, so pollers get a 304 Not Modified until a metric actually
+changes; the snapshot version is reported in the X-Snapshot-Version header.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import snapshot
+from governance_data import (
+    get_policy_stage_counts,
+    get_summary_metrics,
+    PENDING_TASKS_WARNING_THRESHOLD,
+)
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+
+# ----------------------------------------------------
+#   METRICS DOCUMENT
+# ----------------------------------------------------
+def build_metrics(bundles, models, approval_tasks, policy_details, fetch_failures):
+    """Metrics for the unfiltered dashboard, as a JSON-serializable dict.
+
+    The snapshot version is deliberately not part of the body (it is sent as the
+    X-Snapshot-Version header), so a rebuild that changes no metric keeps the ETag.
+    """
+    summary = get_summary_metrics(bundles, bundles, models, approval_tasks)
+    policies = {b["policyId"]: b["policyName"] for b in bundles
+                if b.get("policyId") and b.get("policyName")}
+
+    stages_by_policy = {}
+    for row in get_policy_stage_counts(bundles, policy_details, policies):
+        policy = stages_by_policy.setdefault(row["policy_id"], {
+            "policy_id": row["policy_id"], "policy": row["policy"], "stages": [],
+        })
+        policy["stages"].append({"stage": row["stage"], "bundles": row["bundles"]})
+
+    return {
+        "summary": summary,
+        "pending_tasks_warning": summary["pending_tasks"] > PENDING_TASKS_WARNING_THRESHOLD,
+        "policies": list(stages_by_policy.values()),
+        "partial_data": fetch_failures,
+    }
+
+_cache_lock = threading.Lock()
+_cache = {"path": None, "body": None, "etag": None}
+
+def current_metrics():
+    """(body, etag, version) for the latest snapshot, or (None, None, None) if there is none yet.
+
+    Raises snapshot.SnapshotError or OSError if the snapshot cannot be read.
+    """
+    path = snapshot.latest_snapshot_path(SNAPSHOT_DIR)
+    if not path:
+        return None, None, None
+    with _cache_lock:
+        if _cache["path"] != path:
+            (bundles, _projects, models, approval_tasks, policy_details,
+             _model_attachment_map, fetch_failures) = snapshot.read_snapshot(snapshot.open_snapshot(path))
+            metrics = build_metrics(bundles, models, approval_tasks, policy_details, fetch_failures)
+            body = json.dumps(metrics, sort_keys=True).encode("utf-8")
+            _cache.update(path=path, body=body, etag=f'"{hashlib.sha256(body).hexdigest()}"')
+        return _cache["body"], _cache["etag"], snapshot.snapshot_version(_cache["path"])
+
+# ----------------------------------------------------
+#   HTTP SERVER
+# ----------------------------------------------------
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body, etag, version = current_metrics()
+        except (snapshot.SnapshotError, OSError) as e:
+            # e.g. the snapshot was pruned between listing and reading, or is corrupt
+            self.send_error(503, f"Snapshot unavailable: {e}")
+            return
+        if body is None:
+            self.send_error(503, "No snapshot available yet")
+            return
+
+        # If-None-Match uses weak comparison, so a W/ prefix still matches
+        if_none_match = self.headers.get("If-None-Match", "")
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("X-Snapshot-Version", version)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("X-Snapshot-Version", version)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Pollers hit this constantly; keep the console quiet
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Governance Dashboard metrics as JSON.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("METRICS_PORT", "8889")))
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MetricsHandler)
+    print(f"Serving metrics from {SNAPSHOT_DIR} on http://{args.host}:{args.port}/metrics")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Offline snapshot builder and reader for the Governance Dashboard.
+
+The builder runs the full fetch-and-process pipeline against the Domino API
+and writes the result as Arrow IPC files of flat columns. The dashboard (and
+any replica) memory-maps the newest snapshot instead of calling the API itself,
+and only materializes the fields it reads:
+
+    python snapshot.py --out-dir /mnt/snapshots
+    SNAPSHOT_DIR=/mnt/snapshots streamlit run app.py
+
+Each snapshot is a directory named after its UTC build time, containing one
+Arrow IPC file per table. It is written to a hidden temporary directory and
+renamed into place, so readers never see a partial snapshot.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import pyarrow as pa
+
+# ----------------------------------------------------
+#   SNAPSHOT LAYOUT
+# ----------------------------------------------------
+# Every table is flat string columns holding only the fields the dashboard
+# reads; nested API structures are split into their own tables.
+BUNDLE_COLUMNS = ["id", "name", "projectId", "projectName", "projectOwner",
+                  "policyId", "policyName", "state", "stage"]
+PROJECT_COLUMNS = ["id", "name", "ownerUsername"]
+APPROVAL_TASK_COLUMNS = ["task_name", "stage", "project_id", "bundle_id", "bundle_name", "bundle_link"]
+FETCH_FAILURE_COLUMNS = ["source", "key", "message"]
+
+REQUIRED_TABLES = ["bundles", "bundle_models", "projects", "models", "policy_stages",
+                   "approval_tasks", "model_attachments", "fetch_failures"]
+# Only present in snapshots built with --with-evidence
+OPTIONAL_TABLES = ["evidence"]
+
+class SnapshotError(Exception):
+    """A snapshot directory is incomplete or was written in an older layout."""
+
+# ----------------------------------------------------
+#   ARROW IPC HELPERS
+# ----------------------------------------------------
+def _as_str(value):
+    return None if value is None else str(value)
+
+def _write_table(snapshot_path, name, columns):
+    """Write a dict of column name -> list of values as an Arrow IPC file of strings."""
+    table = pa.table({col: pa.array([_as_str(v) for v in values], type=pa.string())
+                      for col, values in columns.items()})
+    with pa.OSFile(os.path.join(snapshot_path, f"{name}.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def _read_table(path):
+    """Memory-map an Arrow IPC file; the returned table references the mapping without copying."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+def _columns(table, names):
+    """Python lists for the named columns; a column missing from the table reads as all None."""
+    return [table.column(n).to_pylist() if n in table.column_names else [None] * table.num_rows
+            for n in names]
+
+# ----------------------------------------------------
+#   WRITE / READ SNAPSHOTS
+# ----------------------------------------------------
+def write_snapshot(out_dir, bundles, projects, models, approval_tasks, policy_details,
+                   model_attachment_map, fetch_failures, evidence_map=None):
+    """Write one snapshot under out_dir and return its path."""
+    from governance_data import get_model_versions, submitted_evidence_ids
+
+    os.makedirs(out_dir, exist_ok=True)
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    tmp_path = os.path.join(out_dir, f".{version}.tmp")
+    os.makedirs(tmp_path)
+
+    _write_table(tmp_path, "bundles", {col: [b.get(col) for b in bundles] for col in BUNDLE_COLUMNS})
+    # Model versions keep their JSON type so (name, version) keys match after reading.
+    bundle_models = [(b.get("id"), m_name, m_ver)
+                     for b in bundles for (m_name, m_ver) in sorted(get_model_versions([b]), key=str)]
+    _write_table(tmp_path, "bundle_models", {
+        "bundleId": [bid for bid, _, _ in bundle_models],
+        "model_name": [m_name for _, m_name, _ in bundle_models],
+        "version": [json.dumps(m_ver) for _, _, m_ver in bundle_models],
+    })
+    _write_table(tmp_path, "projects", {col: [p.get(col) for p in projects] for col in PROJECT_COLUMNS})
+    _write_table(tmp_path, "models", {
+        "name": [m.get("name") for m in models],
+        "ownerUsername": [m.get("ownerUsername") for m in models],
+        "projectName": [m.get("project", {}).get("name") for m in models],
+    })
+    # One row per (stage, evidence item); a stage without evidence gets one row with no
+    # evidenceId, and a policy without stages one row with neither
+    stage_rows = []
+    for pid, details in policy_details.items():
+        if not details.get("stages"):
+            stage_rows.append((pid, None, None))
+        for stage in details.get("stages", []):
+            evidence_ids = [e.get("id") for e in stage.get("evidenceSet", []) if e.get("id")]
+            for eid in evidence_ids or [None]:
+                stage_rows.append((pid, stage.get("name"), eid))
+    _write_table(tmp_path, "policy_stages", {
+        "policyId": [pid for pid, _, _ in stage_rows],
+        "stage": [stage for _, stage, _ in stage_rows],
+        "evidenceId": [eid for _, _, eid in stage_rows],
+    })
+    _write_table(tmp_path, "approval_tasks", {
+        col: [t.get(col) for t in approval_tasks] for col in APPROVAL_TASK_COLUMNS
+    })
+    attachments = list(model_attachment_map.items())
+    _write_table(tmp_path, "model_attachments", {
+        "model_name": [m_name for (m_name, _), _ in attachments],
+        "version": [json.dumps(m_ver) for (_, m_ver), _ in attachments],
+        "owner": [owner for _, (owner, _) in attachments],
+        "project": [proj for _, (_, proj) in attachments],
+    })
+    _write_table(tmp_path, "fetch_failures", {
+        col: [f.get(col) for f in fetch_failures] for col in FETCH_FAILURE_COLUMNS
+    })
+    if evidence_map is not None:
+        # Only the submitted evidence IDs are kept; a row with no evidenceId marks "none submitted"
+        evidence_rows = []
+        for (bid, pid), evidence in evidence_map.items():
+            for eid in sorted(submitted_evidence_ids(evidence)) or [None]:
+                evidence_rows.append((bid, pid, eid))
+        _write_table(tmp_path, "evidence", {
+            "bundleId": [bid for bid, _, _ in evidence_rows],
+            "policyId": [pid for _, pid, _ in evidence_rows],
+            "evidenceId": [eid for _, _, eid in evidence_rows],
+        })
+
+    final_path = os.path.join(out_dir, version)
+    os.rename(tmp_path, final_path)
+    return final_path
+
+def list_snapshot_paths(snapshot_dir):
+    """Return complete snapshot directories, oldest first."""
+    if not os.path.isdir(snapshot_dir):
+        return []
+    names = sorted(n for n in os.listdir(snapshot_dir)
+                   if not n.startswith(".") and os.path.isdir(os.path.join(snapshot_dir, n)))
+    return [os.path.join(snapshot_dir, n) for n in names]
+
+def latest_snapshot_path(snapshot_dir):
+    """Return the newest snapshot directory, or None if there is none yet."""
+    paths = list_snapshot_paths(snapshot_dir)
+    return paths[-1] if paths else None
+
+def snapshot_version(path):
+    return os.path.basename(os.path.normpath(path))
+
+def open_snapshot(path):
+    """Memory-map every table of a snapshot: {table name: pa.Table}. Nothing is copied or decoded."""
+    tables = {}
+    for name in REQUIRED_TABLES + OPTIONAL_TABLES:
+        table_path = os.path.join(path, f"{name}.arrow")
+        if os.path.exists(table_path):
+            tables[name] = _read_table(table_path)
+        elif name in REQUIRED_TABLES:
+            raise SnapshotError(f"{snapshot_version(path)} has no {name} table; rebuild it with snapshot.py")
+    return tables
+
+def read_snapshot(tables):
+    """Build the dashboard records from open_snapshot() tables, in the shape of
+    app.load_dashboard_data(). Only the fields the dashboard reads are materialized."""
+    models_by_bundle = defaultdict(list)
+    for bid, m_name, m_ver in zip(*_columns(tables["bundle_models"], ["bundleId", "model_name", "version"])):
+        models_by_bundle[bid].append({
+            "type": "ModelVersion",
+            "identifier": {"name": m_name, "version": json.loads(m_ver)},
+        })
+    bundles = tables["bundles"].to_pylist()
+    for b in bundles:
+        b["attachments"] = models_by_bundle.get(b["id"], [])
+
+    projects = tables["projects"].to_pylist()
+    models = [
+        {"name": name, "ownerUsername": owner, "project": {"name": project}}
+        for name, owner, project in zip(*_columns(tables["models"], ["name", "ownerUsername", "projectName"]))
+    ]
+
+    policy_details = {}
+    for pid, stage_name, eid in zip(*_columns(tables["policy_stages"], ["policyId", "stage", "evidenceId"])):
+        stages = policy_details.setdefault(pid, {"stages": []})["stages"]
+        if stage_name is None:
+            continue
+        if not stages or stages[-1]["name"] != stage_name:
+            stages.append({"name": stage_name, "evidenceSet": []})
+        if eid:
+            stages[-1]["evidenceSet"].append({"id": eid})
+
+    approval_tasks = [dict(zip(APPROVAL_TASK_COLUMNS, row)) for row in
+                      zip(*_columns(tables["approval_tasks"], APPROVAL_TASK_COLUMNS))]
+
+    model_attachment_map = {
+        (m_name, json.loads(m_ver)): (owner, project)
+        for m_name, m_ver, owner, project in zip(*_columns(
+            tables["model_attachments"], ["model_name", "version", "owner", "project"]))
+    }
+    fetch_failures = tables["fetch_failures"].to_pylist()
+    return (bundles, projects, models, approval_tasks, policy_details,
+            model_attachment_map, fetch_failures)
+
+def read_snapshot_evidence(tables):
+    """{(bundle_id, policy_id): [submitted evidence]}, or None if the snapshot has no evidence."""
+    if "evidence" not in tables:
+        return None
+    evidence_map = {}
+    for bid, pid, eid in zip(*_columns(tables["evidence"], ["bundleId", "policyId", "evidenceId"])):
+        items = evidence_map.setdefault((bid, pid), [])
+        if eid:
+            items.append({"evidenceId": eid})
+    return evidence_map
+
+def prune_snapshots(snapshot_dir, keep):
+    """Delete all but the newest `keep` snapshots."""
+    for path in list_snapshot_paths(snapshot_dir)[:-keep]:
+        shutil.rmtree(path, ignore_errors=True)
+
+# ----------------------------------------------------
+#   BUILDER
+# ----------------------------------------------------
+def build_snapshot(out_dir, with_evidence=False):
+    """Run the full fetch-and-process pipeline and write its result as a snapshot.
+
+    Raises FetchError, without writing anything, if bundles, projects or
+    registered models cannot be fetched: an empty snapshot would otherwise
+    become the newest one and replace real data on every replica.
+    """
+    from governance_data import (
+        FetchError,
+        fetch_data,
+        process_bundles,
+        get_approval_tasks,
+        get_policy_details_map,
+        get_model_attachment_map,
+        load_bundle_evidence,
+    )
+
+    bundles, projects, models, base_failures = fetch_data()
+    if base_failures:
+        raise FetchError("; ".join(f"{f['source']}: {f['message']}" for f in base_failures))
+    bundles = process_bundles(bundles)
+    approval_tasks, task_failures = get_approval_tasks(bundles)
+    policy_details, policy_failures = get_policy_details_map(bundles)
+    model_attachment_map = get_model_attachment_map(bundles)
+    fetch_failures = task_failures + policy_failures
+    evidence_map = None
+    if with_evidence:
+        governed = [b for b in bundles if b.get("policyName")]
+        evidence_map, evidence_failures = load_bundle_evidence(governed)
+        fetch_failures += evidence_failures
+    path = write_snapshot(out_dir, bundles, projects, models, approval_tasks, policy_details,
+                          model_attachment_map, fetch_failures, evidence_map)
+    return path, fetch_failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a Governance Dashboard data snapshot.")
+    parser.add_argument("--out-dir", default=os.getenv("SNAPSHOT_DIR", "snapshots"),
+                        help="Directory that holds the snapshots (default: $SNAPSHOT_DIR or ./snapshots)")
+    parser.add_argument("--keep", type=int, default=5,
+                        help="Number of snapshots to keep (default: 5)")
+    parser.add_argument("--with-evidence", action="store_true",
+                        help="Also fetch bundle evidence for the Evidence Completeness view")
+    args = parser.parse_args()
+
+    from governance_data import FetchError
+
+    try:
+        path, fetch_failures = build_snapshot(args.out_dir, with_evidence=args.with_evidence)
+    except FetchError as e:
+        sys.exit(f"Snapshot not written: {e}")
+    if args.keep > 0:
+        prune_snapshots(args.out_dir, args.keep)
+    print(f"Wrote snapshot {path}")
+    for f in fetch_failures:
+        print(f"  partial: {f['source']} {f['key']}: {f['message']}")
+
+if __name__ == "__main__":
+    main()